@@ -23,15 +23,25 @@ DEALINGS IN THE SOFTWARE.
 
 
 import argparse
+import collections
+import concurrent.futures
+import fnmatch
 import json
+import mmap
 import os
 import pathlib
+import re
 import shutil
 import sys
 
+try:
+    import orjson # optional, parses '3rdpartylibs.json' faster
+except ImportError:
+    orjson = None
+
 
 def export_used_licenses(export_folder, thirdparty_libs, build_dir,
-                         src_dir=None):
+                         src_dir=None, jobs=None, sigs_cache=None):
     '''Exporting the licenses of the used Qt 3rd-party libraries to
     the :export_folder: folder
 
@@ -45,31 +55,173 @@ def export_used_licenses(export_folder, thirdparty_libs, build_dir,
                             if a 'non-shadow build' is used, need to exclude
                             any premade 'Makefile's from the analysis; if a
                             'shadow built' is used, there'll not be any in
-                            the build directory)
+                            the build directory),
+    :param jobs:            number of processes analysing the 'Makefile's
+                            (optional, the number of CPUs by default; if 1,
+                            the 'Makefile's are analysed in this process),
+    :param sigs_cache:      SignaturesCache to take the library signatures
+                            from and to put them into (optional)
     '''
 
     print('Exporting the licenses of the used Qt 3rd-party libraries...')
 
     export_folder = pathlib.Path(export_folder)
 
-    libs = libraries_factory(thirdparty_libs)
+    libs = libraries_factory(thirdparty_libs, sigs_cache)
+    pattern = signatures_pattern(libs)
+
+    mf_paths = Makefile.search(build_dir, src_dir=src_dir)
+
+    used_ids = set()
+    if jobs == 1:
+        # The next Makefiles are read while the current one is analysed
+        for mf_path, data in read_ahead(mf_paths):
+            used_ids |= scan_makefile(mf_path, pattern, used_ids, data)
+            if len(used_ids) == len(libs):
+                break
+    else:
+        # The pattern is sent to every process once, not with every Makefile
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_scan_process,
+                initargs=(pattern,)) as executor:
+            for ids in executor.map(_scan_makefile, mf_paths, chunksize=8):
+                used_ids |= ids
+
+    for lib in libs:
+        if lib.id() in used_ids:
+            new_license_dir = export_folder / lib.id()
+            lib.export_license_file(new_license_dir)
+            lib.export_copyright_file(new_license_dir)
+
+
+def scan_makefile(mf_path, pattern, found_ids=frozenset(), data=None):
+    '''Return the identificators of the libraries used in the Makefile
+
+    :param mf_path:     path to the Makefile,
+    :param pattern:     FileNamesPattern (from 'signatures_pattern'),
+    :param found_ids:   identificators of the libraries that are already
+                        found (optional, their paths are not checked and
+                        they are not returned),
+    :param data:        content of the Makefile if it's already read
+                        (optional),
+    :return: Set[str]
+    '''
+
+    used_ids = set()
+    with Makefile(mf_path, data) as mf:
+        for i, sig_paths in mf.scan(pattern):
+            if all(id in found_ids or id in used_ids
+                   for ids in sig_paths.values() for id in ids):
+                continue
+
+            path = mf.path_at(i)
+            used_ids.update(sig_paths.get(path, []))
+    return used_ids - found_ids
+
+
+# The state of a Makefile scanning process (set by '_init_scan_process'):
+# the pattern and the identificators of the libraries the process has found
+_scan_pattern = None
+_scan_found_ids = set()
+
+
+def _init_scan_process(pattern):
+    global _scan_pattern
+    _scan_pattern = pattern
+
+
+def _scan_makefile(mf_path):
+    used_ids = scan_makefile(mf_path, _scan_pattern, _scan_found_ids)
+    _scan_found_ids.update(used_ids)
+    return used_ids
+
+
+def read_ahead(file_paths, count=16, threads=8):
+    '''Read the files in threads, up to :count: files ahead of the one
+    being processed, so reading the files overlaps with processing them
+    (useful if the files are on slow or network storage)
+
+    :param file_paths:  paths to the files,
+    :param count:       how many files can be read ahead,
+    :param threads:     number of the reading threads,
+    :return: generator of tuples (file path, file content (bytes))
+    '''
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+    reads = collections.deque()
+    try:
+        for file_path in file_paths:
+            reads.append((file_path, executor.submit(_read_file, file_path)))
+            if len(reads) < count:
+                continue
+
+            file_path, read = reads.popleft()
+            yield file_path, read.result()
+
+        while reads:
+            file_path, read = reads.popleft()
+            yield file_path, read.result()
+    finally:
+        # If the caller stops early, the files not being read yet are skipped
+        for _, read in reads:
+            read.cancel()
+        executor.shutdown()
+
+
+def _read_file(file_path):
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+def _copy_file(src, dst):
+    # 'os.copy_file_range' (Linux) copies the data in the kernel, if it's not
+    # available, the file systems do not support it or it does not copy
+    # the whole file (some file systems return 0 too early), 'shutil' is used
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    if copy_file_range is not None:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                size = os.fstat(fsrc.fileno()).st_size
+                copied = 0
+                while copied < size:
+                    count = copy_file_range(fsrc.fileno(), fdst.fileno(),
+                                            size - copied)
+                    if not count:
+                        break
+                    copied += count
+            if copied == size:
+                return
+        except OSError:
+            pass
+
+    shutil.copyfile(src, dst)
+
+
+def load_thirdparty_libs(file_path):
+    '''Return the Qt 3rd-party libraries with its attributes from the file
+    generated by 'qtattributionsscanner' ('orjson' is used if installed)
+
+    :param file_path: path to the file (e.g. '3rdpartylibs.json'),
+    :return: List[Dict[Attribute, Value]]
+    '''
+
+    with open(file_path, 'rb') as f:
+        data = f.read()
 
-    for mf_path in Makefile.search(build_dir, src_dir=src_dir):
-        mf = Makefile(mf_path)
-        for lib in libs.copy():
-            if lib.used(mf):
-                new_license_dir = export_folder / lib.id()
-                lib.export_license_file(new_license_dir)
-                lib.export_copyright_file(new_license_dir)
-                libs.remove(lib)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
-def libraries_factory(thirdparty_libs):
+def libraries_factory(thirdparty_libs, sigs_cache=None):
     '''Return a set of 'library' objects based on the attributes from
     :thirdparty_libs:
 
     :param thirdparty_libs: list containing the Qt 3rd-party libraries with its
                             attributes (List[Dict[Attribute, Value]]),
+    :param sigs_cache:      SignaturesCache for the library signatures
+                            (optional),
     :return: Set[Union[Library, WebgradientsLib]]
     '''
 
@@ -77,14 +229,32 @@ def libraries_factory(thirdparty_libs):
     for lib_attrs in thirdparty_libs:
         id = lib_attrs['Id']
         if id == 'webgradients':
-            lib = WebgradientsLib(lib_attrs)
+            lib = WebgradientsLib(lib_attrs, sigs_cache)
         else:
-            lib = Library(lib_attrs)
+            lib = Library(lib_attrs, sigs_cache)
 
         libs.add(lib)
     return libs
 
 
+def signatures_pattern(libs):
+    '''Return a 'FileNamesPattern' that finds the signatures of :libs: in
+    a Makefile. The pattern is keyed on the signature file names, the value
+    of a name is the dictionary {signature path: [library ids]} (the same
+    file name can be used by different libraries)
+
+    :param libs: Set[Union[Library, WebgradientsLib]],
+    :return: FileNamesPattern
+    '''
+
+    names = {}
+    for lib in libs:
+        for name, path in lib.signatures:
+            sig_paths = names.setdefault(name, {})
+            sig_paths.setdefault(path, []).append(lib.id())
+    return FileNamesPattern(names)
+
+
 def export_all_licenses(export_folder, thirdparty_libs):
     '''Exporting the licenses of all Qt 3rd-party libraries to
     the :export_folder: folder
@@ -125,12 +295,21 @@ def fix_3rdpartylib_paths(thirdparty_libs, prev_src_dir, src_dir):
     src_dir = pathlib.Path(src_dir)
     prev_src_dir = pathlib.Path(prev_src_dir)
 
+    # Usually the paths start with the whole :prev_src_dir: path, then it's
+    # enough to replace the prefix (no parsing into parts and joining)
+    prev_prefix = os.path.join(str(prev_src_dir), '')
+    new_prefix = os.path.join(str(src_dir), '')
+
     for lib in thirdparty_libs:
         for path_attr in ['LicenseFile', 'Path']:
             path = lib[path_attr]
             if not path:
                 continue
 
+            if path.startswith(prev_prefix):
+                lib[path_attr] = new_prefix + path[len(prev_prefix):]
+                continue
+
             path_parts = pathlib.Path(path).parts
             prev_src_folder_pos = path_parts.index(prev_src_dir.name)
             same_parts = path_parts[prev_src_folder_pos+1:]
@@ -140,42 +319,39 @@ def fix_3rdpartylib_paths(thirdparty_libs, prev_src_dir, src_dir):
 class Library:
     '''Represent a 3rd-party library used by Qt
 
-    :param lib_data: dictionary with 3rd-party library attributes (from
-                     '3rdpartylibs.json' file)
+    :param lib_data:    dictionary with 3rd-party library attributes (from
+                        '3rdpartylibs.json' file),
+    :param sigs_cache:  SignaturesCache for the signatures found by walking
+                        the library directory (optional)
     '''
 
-    def __init__(self, lib_data):
+    __slots__ = ('_data', '_id', '_signatures', '_sigs_cache')
+
+    def __init__(self, lib_data, sigs_cache=None):
         self._data = lib_data
+        # Used in every hash and comparison (the libraries are kept in sets)
+        self._id = lib_data['Id']
         self._signatures = []
-
-    def used(self, makefile):
-        '''Return True if any of the library files is found in :makefile:,
-        False - otherwise
-
-        :param makefile: Makefile object
-        '''
-
-        for sig in self.signatures:
-            if makefile.has_path(sig):
-                return True
-        return False
+        self._sigs_cache = sigs_cache
 
     @property
     def signatures(self):
-        '''Return the library file paths that used to find out if the lib is
-        used in a Qt build. If the lib does not have information about
-        the library files but only directory, the path to the directory will
-        be returned, for example, '.../3rdparty/pcre2/' (with a trailing slash)
+        '''Return the library files that used to find out if the lib is
+        used in a Qt build, as tuples (file name (bytes, as it is written
+        in Makefiles), normalised file path). If the lib does not have
+        information about the library files but only directory, the source
+        files found in the directory are returned
         '''
 
         sigs = self._signatures
         if sigs:
             return sigs
 
-        lib_path, lib_filenames = pathlib.Path(self.path()), self.files()
+        lib_path, lib_filenames = os.path.normpath(self.path()), self.files()
         if lib_filenames: # e.g. 'linuxperf'
-            lib_filepaths = [str(lib_path / name) for name in lib_filenames]
-        elif lib_path.suffix: # e.g. 'grayraster'
+            lib_filepaths = [os.path.join(lib_path, name)
+                             for name in lib_filenames]
+        elif os.path.splitext(lib_path)[1]: # e.g. 'grayraster'
             lib_filepaths = [lib_path]
         else: # e.g. 'angle'
             suffixes = (
@@ -185,10 +361,41 @@ class Library:
                 '.S', # 'pixman', NEED TO BE TESTED (ARM NEON)
                 '.ttf' # fonts for WASM, NEED TO BE TESTED
             )
-            lib_filepaths = [filepath for filepath in lib_path.rglob('*')
-                             if filepath.suffix in suffixes]
-
-        self._signatures = lib_filepaths
+            lib_filepaths = self._walk_signatures(lib_path, suffixes)
+
+        # The encoded names and the normalised paths are made once here, not
+        # every time a Makefile is checked
+        sigs = []
+        for filepath in lib_filepaths:
+            filepath = os.path.normpath(filepath)
+            sigs.append((os.fsencode(os.path.basename(filepath)), filepath))
+
+        self._signatures = sigs
+        return sigs
+
+    def _walk_signatures(self, lib_path, suffixes):
+        cache = self._sigs_cache
+        if cache is not None:
+            lib_filepaths = cache.get(lib_path, suffixes)
+            if lib_filepaths is not None:
+                return lib_filepaths
+
+        # Only the matching names are joined into paths (no 'Path' for
+        # every file in the tree as 'rglob' does)
+        # Version control directories are not walked, there are no sources
+        # in there (other directories, e.g. 'tests', can be compiled)
+        skip_dirs = {'.git', '.hg', '.svn'}
+
+        lib_filepaths, dir_mtimes = [], {}
+        for dirpath, dirnames, filenames in os.walk(lib_path):
+            dirnames[:] = [name for name in dirnames if name not in skip_dirs]
+            dir_mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+            lib_filepaths.extend(os.path.join(dirpath, name)
+                                 for name in filenames
+                                 if name.endswith(suffixes))
+
+        if cache is not None and dir_mtimes:
+            cache.set(lib_path, suffixes, dir_mtimes, lib_filepaths)
         return lib_filepaths
 
     def files(self):
@@ -224,14 +431,13 @@ class Library:
         :param export_folder: folder to copy the license file into
         '''
 
-        if not export_folder.exists():
-            export_folder.mkdir(parents=True)
+        export_folder.mkdir(parents=True, exist_ok=True)
 
         license_file_path = self.license_file()
         if license_file_path:
             name = pathlib.Path(license_file_path).name
             new_path = export_folder / name
-            shutil.copyfile(license_file_path, new_path)
+            _copy_file(license_file_path, new_path)
         else:
             # If no license file in the attributes, it's 'Public Domain'
             self._public_domain(export_folder)
@@ -247,8 +453,7 @@ class Library:
         :param export_folder: folder to copy the copyright file into
         '''
 
-        if not export_folder.exists():
-            export_folder.mkdir(parents=True)
+        export_folder.mkdir(parents=True, exist_ok=True)
 
         copyright_file = export_folder / 'COPYRIGHT'
         with open(copyright_file, 'w') as f:
@@ -260,81 +465,238 @@ class Library:
         attribute)
         '''
 
-        return self._data['Id']
+        return self._id
 
     def __eq__(self, l):
         if not isinstance(l, Library):
             return NotImplemented
-        return self.id() == l.id()
+        return self._id == l._id
 
     def __hash__(self):
-        return hash(self.id())
+        return hash(self._id)
 
 
 class WebgradientsLib(Library):
     '''Represent the 'webgradients' 3rd-party library'''
 
+    __slots__ = ()
+
     @property
     def signatures(self):
-        '''Return the 'webgradients.binaryjson' path'''
+        '''Return the 'webgradients.binaryjson' name and path'''
+
+        sigs = self._signatures
+        if sigs:
+            return sigs
+
+        # The path is made from the attributes directly, the library
+        # directory is never walked
+        file_path, lib_filenames = os.path.normpath(self.path()), self.files()
+        if lib_filenames:
+            file_path = os.path.join(file_path, lib_filenames[0])
 
-        file_path = super().signatures[0]
-        parts = file_path.split('.')
         # Not '.css' but premade '.binaryjson' is used in compilation
-        parts[-1] = 'binaryjson'
-        return ['.'.join(parts)]
+        file_path = os.path.splitext(file_path)[0] + '.binaryjson'
 
+        sigs = [(os.fsencode(os.path.basename(file_path)), file_path)]
+        self._signatures = sigs
+        return sigs
 
-class Makefile:
-    '''Represent a Makefile used in a Qt build process
 
-    :param file_path: path to the Makefile
+class SignaturesCache:
+    '''Persistent cache of the library signatures found by walking
+    the library directories (e.g. 'angle'). The modification times of all
+    the directories of a library are saved together with its signatures,
+    so the signatures are valid until a file is added into (or removed
+    from) any of the directories
+
+    :param file_path: path to the cache file (JSON)
     '''
 
     def __init__(self, file_path):
         self.file_path = pathlib.Path(file_path)
 
-        with open(file_path, 'r') as f:
-            self._data = f.read()
+        try:
+            with open(self.file_path, 'r') as f:
+                self._data = json.load(f)
+        except (OSError, ValueError): # no cache yet or it's broken
+            self._data = {}
 
-    def has_path(self, path):
-        '''Check if the Makefile uses :path: in the Qt build process
+        if not isinstance(self._data, dict): # valid JSON but not a cache
+            self._data = {}
 
-        :param path: path to some file,
-        :return: True - the path has been found, False - otherwise
+    def get(self, lib_path, suffixes):
+        '''Return the cached signatures of the library or None if there are
+        none or they are out of date
+
+        :param lib_path: path to the library directory,
+        :param suffixes: suffixes of the library files,
+        :return: List[str] or None
         '''
 
-        separators = {' ', '\n', '\t'}
-        data = self._data
-        search_area_start = data.find('####### Compile')
-        if search_area_start == -1:
+        entry = self._data.get(lib_path)
+        if not self._valid_entry(entry):
+            return None
+
+        if entry['suffixes'] != list(suffixes):
+            return None
+
+        for dir_path, mtime in entry['mtimes'].items():
+            try:
+                if os.stat(dir_path).st_mtime_ns != mtime:
+                    return None
+            except OSError:
+                return None
+        return entry['signatures']
+
+    @staticmethod
+    def _valid_entry(entry):
+        # A malformed entry (e.g. the file was edited by hand) is a miss,
+        # it's replaced when the signatures are put into the cache again
+        if not isinstance(entry, dict):
             return False
 
-        search_area_end = data.find('####### Install')
+        suffixes = entry.get('suffixes')
+        mtimes = entry.get('mtimes')
+        signatures = entry.get('signatures')
+        return (isinstance(suffixes, list)
+                and isinstance(mtimes, dict)
+                and all(isinstance(mtime, int) for mtime in mtimes.values())
+                and isinstance(signatures, list)
+                and all(isinstance(sig, str) for sig in signatures))
+
+    def set(self, lib_path, suffixes, dir_mtimes, signatures):
+        '''Put the signatures of the library into the cache
+
+        :param lib_path:    path to the library directory,
+        :param suffixes:    suffixes of the library files,
+        :param dir_mtimes:  dictionary {directory path: modification time
+                            (in nanoseconds)} of all the library directories,
+        :param signatures:  library signatures
+        '''
+
+        self._data[lib_path] = {
+            'suffixes': list(suffixes),
+            'mtimes': dir_mtimes,
+            'signatures': signatures,
+        }
+
+    def save(self):
+        '''Write the cache into the cache file'''
+
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.file_path, 'w') as f:
+            json.dump(self._data, f)
+
+    @staticmethod
+    def default_path():
+        '''Return the default path to the cache file (in the user cache
+        directory)
+        '''
+
+        if sys.platform.startswith('win'):
+            cache_dir = os.environ.get('LOCALAPPDATA')
+        else:
+            cache_dir = os.environ.get('XDG_CACHE_HOME')
+        if not cache_dir:
+            cache_dir = pathlib.Path.home() / '.cache'
+
+        return (pathlib.Path(cache_dir) / 'qt-3rdparty-licenses'
+                / 'signatures.json')
+
+
+class Makefile:
+    '''Represent a Makefile used in a Qt build process
+
+    :param file_path:   path to the Makefile,
+    :param data:        content of the Makefile (bytes, optional, if it's
+                        already read; the file is not opened then)
+    '''
+
+    def __init__(self, file_path, data=None):
+        self.file_path = pathlib.Path(file_path)
+        # The paths in the Makefile are relative to its real directory
+        self._dir = str(self.file_path.parent.resolve())
+
+        # The Makefile is mapped into memory (not read and decoded) so only
+        # the searched pages are loaded and 'find' works on raw bytes
+        if data is None:
+            with open(file_path, 'rb') as f:
+                try:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError: # an empty file cannot be mapped
+                    data = b''
+
+        self._data = data
+        self._compile_start = data.find(b'####### Compile')
+        self._install_start = data.find(b'####### Install')
+        if self._install_start == -1:
+            self._install_start = len(data)
+
+    def close(self):
+        '''Release the memory-mapped Makefile data'''
+
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def scan(self, pattern):
+        '''Find the file names of :pattern: in the Makefile in one pass
+
+        :param pattern: FileNamesPattern,
+        :return: generator of tuples (i, value), where 'i' is the index of
+                 a found file name (see 'path_at') and 'value' is the value
+                 of the name in :pattern:
+        '''
+
+        search_area_start = self._compile_start
+        if search_area_start == -1:
+            return
 
         # Makefiles generated by qmake do not use implicit rules, wildcards (as
         # far as I know, only explicit rules) so it must be sufficient just to
         # search for library files
 
-        path = pathlib.Path(path)
-        name = str(path.name)
-        i = data.find(name, search_area_start, search_area_end)
-        while i != -1:
-            start, end = i, i
+        search_area_end = self._install_start
+        for i, value in pattern.iter(self._data, search_area_start,
+                                     search_area_end):
+            yield i, value
+
+    def path_at(self, i):
+        '''Return the sanitised path the byte with index :i: belongs to
 
-            while data[start] not in separators:
-                start -= 1
+        :param i: index of a byte in the Makefile (e.g. from 'scan'),
+        :return: absolute normalised path
+        '''
 
-            while data[end] not in separators:
-                end += 1
+        start, end = self._token_bounds(i)
+        return self._sanitise(os.fsdecode(self._data[start:end]))
+
+    def _token_bounds(self, i):
+        # Return the (start, end) indices of the whitespace separated token
+        # the byte with index :i: belongs to. The separators are searched by
+        # 'rfind'/'find' (in C), not by checking the bytes one by one. Every
+        # search is limited by the closest separator found so far (spaces
+        # are the most common, so they go first), otherwise a separator that
+        # is not used at all (e.g. '\r' on Linux) would make every search
+        # go through the whole search area
+        data = self._data
+        start = self._compile_start
+        end = self._install_start
 
-            contender = self._sanitise(data[start+1:end])
-            if contender == str(path):
-                return True
+        for sep in (b' ', b'\n', b'\t', b'\r'):
+            start = max(start, data.rfind(sep, start, i))
 
-            i = data.find(name, end+1, search_area_end)
+            sep_pos = data.find(sep, i, end)
+            if sep_pos != -1:
+                end = sep_pos
 
-        return False
+        return start + 1, end
 
     def _sanitise(self, s):
         if s[-1] == ':':
@@ -344,11 +706,10 @@ class Makefile:
             if s.startswith(prefix):
                 s = s[len(prefix):]
 
-        cwd = pathlib.Path.cwd()
-        os.chdir(self.file_path.parent)
-        path = pathlib.Path(s).resolve()
-        os.chdir(cwd)
-        return str(path)
+        # Lexical normalisation only, no 'chdir' (it changes the working
+        # directory of the whole process) and no 'resolve' syscalls for
+        # every found path
+        return os.path.normpath(os.path.join(self._dir, s))
 
     @staticmethod
     def search(build_dir, src_dir=None):
@@ -363,23 +724,105 @@ class Makefile:
         makefile_name = 'Makefile' # Linux, gcc
 
         # Exclude the premade 'Makefile's
-        exclude_mfs = []
+        exclude_mfs = set()
         if src_dir is not None:
-            src_dir = pathlib.Path(src_dir)
-            for mf_path in src_dir.rglob(makefile_name):
-                path_tail = str(mf_path.relative_to(src_dir))
-                exclude_mfs.append(path_tail)
-
-        exclude_mfs = tuple(exclude_mfs)
+            for _, path_tail in Makefile._walk(src_dir, makefile_name):
+                exclude_mfs.add(path_tail)
 
         if sys.platform.startswith('win'):
             makefile_name = 'Makefile*Release' # Win, msvc
 
-        build_dir = pathlib.Path(build_dir)
-        makefiles = [mf_path for mf_path in build_dir.rglob(makefile_name)
-                     if not str(mf_path).endswith(exclude_mfs)]
+        makefiles = [mf_path for mf_path, path_tail
+                     in Makefile._walk(build_dir, makefile_name)
+                     if path_tail not in exclude_mfs]
         return makefiles
 
+    @staticmethod
+    def _walk(root, name):
+        # Yield the paths (full and relative to :root:) of the files matching
+        # the :name: pattern in the :root: directory tree. 'os.scandir' is
+        # used instead of 'Path.rglob', so no 'Path' is made for every entry
+        # and the entry types come from the directory listing (no 'stat')
+        flags = re.IGNORECASE if sys.platform.startswith('win') else 0
+        match = re.compile(fnmatch.translate(name), flags).match
+
+        root = os.fspath(root)
+        root_len = len(os.path.join(root, ''))
+        dirs = [root]
+        while dirs:
+            try:
+                entries = os.scandir(dirs.pop())
+            except PermissionError: # skipped, as 'Path.rglob' does
+                continue
+
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif match(entry.name):
+                        yield entry.path, entry.path[root_len:]
+
+
+class FileNamesPattern:
+    '''Compiled regular expression finding several file names in a text
+    in a single pass. A name is found only if it is the last component of
+    a path (it is preceded by a path separator or whitespace and followed
+    by whitespace)
+
+    :param names: dictionary {file name (bytes): value}
+    '''
+
+    def __init__(self, names):
+        self._names = names
+
+        # The names are put in a trie and the trie is turned into nested
+        # groups, so 're' checks a common prefix once instead of trying every
+        # name one by one at each position of the text
+        trie = {}
+        for name in names:
+            node = trie
+            for c in name:
+                node = node.setdefault(c, {})
+            node[None] = {}
+
+        # The separator before a name is matched (not looked behind), then
+        # 're' can skip the positions that are not separators quickly; most
+        # of the Makefiles do not use any library and this is all the work
+        # done for them
+        self._pattern = re.compile(
+            rb'[/\\ \n\t\r]' + self._trie_regex(trie) + rb'(?![^ \n\t\r])'
+        )
+
+    @classmethod
+    def _trie_regex(cls, node):
+        alternatives = [re.escape(bytes([c])) + cls._trie_regex(node[c])
+                        for c in sorted(c for c in node if c is not None)]
+        if not alternatives:
+            # A leaf (the end of a name) or no names at all (never matches)
+            return b'' if None in node else b'(?!)'
+
+        regex = b'|'.join(alternatives)
+        if None in node:
+            return b'(?:' + regex + b')?'
+        if len(alternatives) > 1:
+            return b'(?:' + regex + b')'
+        return regex
+
+    def iter(self, text, start, end):
+        '''Find the file names in :text:
+
+        :param text:    bytes-like object to search the names in,
+        :param start:   index where to start the search,
+        :param end:     index where to end the search,
+        :return: generator of tuples (i, value), where 'i' is the index of
+                 a found name in :text: and 'value' is the value of the name
+        '''
+
+        names = self._names
+        start = max(start - 1, 0) # the separator can be just before :start:
+        for match in self._pattern.finditer(text, start, end):
+            yield match.start() + 1, names[match.group()[1:]]
+
 
 if __name__ == '__main__':
 
@@ -483,10 +926,26 @@ if __name__ == '__main__':
               "if 'non-shadow build' is used, the new Qt5 source directory "
               "is the build directory"),
     )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        metavar='JOBS',
+        help=('number of processes analysing the makefiles (the number of '
+              'CPUs by default)'),
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=('do not cache the library signatures (the files of '
+              'the libraries) between the runs'),
+    )
     args = parser.parse_args()
 
-    with open(args.attributes, 'r') as f:
-        thirdparty_libs = json.load(f)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('argument -j/--jobs: must be a positive number')
+
+    thirdparty_libs = load_thirdparty_libs(args.attributes)
 
     fix = args.fix
     if fix is not None:
@@ -498,4 +957,16 @@ if __name__ == '__main__':
         export_all_licenses(export_dir, thirdparty_libs)
     else:
         src_dir = args.source
-        export_used_licenses(export_dir, thirdparty_libs, build_dir, src_dir)
+        jobs = args.jobs
+        sigs_cache = None
+        if not args.no_cache:
+            sigs_cache = SignaturesCache(SignaturesCache.default_path())
+
+        export_used_licenses(export_dir, thirdparty_libs, build_dir, src_dir,
+                             jobs, sigs_cache)
+
+        if sigs_cache is not None:
+            try:
+                sigs_cache.save()
+            except OSError as e:
+                print(f'Cannot save the signatures cache: {e}')